@@ -1,34 +1,197 @@
+import asyncio
 import base64
-import hashlib
 import hmac
+import json
 import logging
+import os
+import threading
 import time
-import traceback
 import urllib.parse
 import warnings
-from collections.abc import Sequence
-from typing import List, Tuple, Union
+import weakref
+from typing import List, Optional, Tuple, Union
 
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import h2  # noqa: F401
+except ImportError:
+    HTTP2 = False
+else:
+    HTTP2 = True
+
 warnings.filterwarnings("ignore")
 
 default_logger = logging.getLogger("ddbot")
 
+API_URL = "https://oapi.dingtalk.com/robot/send"
 
-class DDBot:
-    """钉钉自定义机器人对象(同步)
-    :param access_token: 机器人webhook的access_token字段
-    :param secret: 机器人的secret字段
-    :param logger: 设置为 ``True`` 开启日志或者传入一个 logger 对象用来输出日志,
-                    设置为 `False` 来关闭日志，默认为 `True`
-    :param timeout: 发起http请求时，允许等待响应的时间
+# 连接池配置，保持与钉钉服务器的长连接，避免重复建立TCP+TLS连接
+CLIENT_LIMITS = httpx.Limits(
+    max_connections=1000, max_keepalive_connections=100, keepalive_expiry=60
+)
+
+# 钉钉允许时间戳与服务器时间相差1小时以内，签名在此时间(秒)内复用
+SIGN_CACHE_TTL = 30
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+def _json_dumps(obj) -> bytes:
+    """将数据序列化为JSON字节串，安装了 ``orjson`` 时优先使用"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes):
+    """解码JSON数据，安装了 ``orjson`` 时优先使用"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _mobiles_json(mobiles) -> bytes:
+    """将被@人的手机号直接序列化为JSON数组，单个手机号(包括字符串)视为一个元素"""
+    if mobiles is None:
+        return b"[]"
+    if not isinstance(mobiles, (list, tuple)):
+        mobiles = (mobiles,)
+    return b"[" + b",".join(_json_dumps(str(i)) for i in mobiles) + b"]"
+
+
+def _at_json(atMobiles, isAtAll) -> bytes:
+    return (
+        b'{"atMobiles":'
+        + _mobiles_json(atMobiles)
+        + b',"isAtAll":'
+        + _json_dumps(isAtAll)
+        + b"}"
+    )
+
+
+def _quote_b64(b64: bytes) -> bytes:
+    """对base64结果进行URL编码，其中只有 ``+/=`` 三个字符需要转义"""
+    return b64.replace(b"+", b"%2B").replace(b"/", b"%2F").replace(b"=", b"%3D")
+
+
+#################### 消息构建 ####################
+# 以下函数返回已经序列化的消息体，参数说明见机器人对象对应的方法
+
+
+def _build_text(content, atMobiles, isAtAll) -> bytes:
+    return (
+        b'{"msgtype":"text","text":'
+        + _json_dumps({"content": content})
+        + b',"at":'
+        + _at_json(atMobiles, isAtAll)
+        + b"}"
+    )
+
+
+def _build_link(title, text, messageURL, picURL) -> bytes:
+    return _json_dumps(
+        {
+            "msgtype": "link",
+            "link": {
+                "text": text,
+                "title": title,
+                "picUrl": picURL,
+                "messageUrl": messageURL,
+            },
+        }
+    )
+
+
+def _build_markdown(title, text, atMobiles, isAtAll) -> bytes:
+    return (
+        b'{"msgtype":"markdown","markdown":'
+        + _json_dumps({"title": title, "text": text})
+        + b',"at":'
+        + _at_json(atMobiles, isAtAll)
+        + b"}"
+    )
+
+
+def _build_whole_action_card(
+    title, text, singleTitle, singleURL, btnOrientation
+) -> bytes:
+    return _json_dumps(
+        {
+            "actionCard": {
+                "title": title,
+                "text": text,
+                "btnOrientation": btnOrientation,
+                "singleTitle": singleTitle,
+                "singleURL": singleURL,
+            },
+            "msgtype": "actionCard",
+        }
+    )
+
+
+def _build_separated_action_card(title, text, btns, btnOrientation) -> bytes:
+    if isinstance(btns, tuple):
+        btns = [btns]
+    return _json_dumps(
+        {
+            "msgtype": "actionCard",
+            "actionCard": {
+                "title": title,
+                "text": text,
+                "hideAvatar": "0",
+                "btnOrientation": btnOrientation,
+                "btns": [{"title": i[0], "actionURL": i[1]} for i in btns],
+            },
+        }
+    )
+
+
+def _build_feed_card(links) -> bytes:
+    if isinstance(links, tuple):
+        links = [links]
+    return _json_dumps(
+        {
+            "msgtype": "feedCard",
+            "feedCard": {
+                "links": [
+                    {"title": i[0], "messageURL": i[1], "picURL": i[2]} for i in links
+                ]
+            },
+        }
+    )
+
+
+class _BaseDDBot:
+    """同步和异步机器人对象共用的部分
+    子类需要提供创建http客户端的静态方法 ``_new_client`` 和发送请求的 ``post`` 方法
     """
 
-    def __init__(self, access_token: str, secret: str, logger=True, timeout=20):
+    _shared_client = None
+    _shared_client_lock = threading.Lock()
+    # 记录所有实例，fork之后在子进程中重建它们的锁
+    _instances = weakref.WeakSet()
+
+    def __init__(
+        self,
+        access_token: str,
+        secret: str,
+        logger=True,
+        timeout=20,
+        share_client=True,
+    ):
+        self._sig_lock = threading.Lock()
+        self._sig_cache = (0, None)
+        _BaseDDBot._instances.add(self)
         self.access_token = access_token
         self.secret = secret
-        self.client = httpx.Client(timeout=timeout)
+        self.timeout = timeout
+        self._client = None if share_client else self._new_client()
 
         if not isinstance(logger, bool):
             self.logger = logger
@@ -45,59 +208,158 @@ class DDBot:
                 )
                 self.logger.addHandler(h)
 
+    @property
+    def access_token(self) -> str:
+        """机器人webhook的access_token字段，修改后会重新生成webhook地址"""
+        return self._access_token
+
+    @access_token.setter
+    def access_token(self, access_token: str):
+        with self._sig_lock:
+            self._access_token = access_token
+            self._url_prefix = "{}?access_token={}".format(
+                API_URL, urllib.parse.quote_plus(access_token)
+            ).encode("ascii")
+            self._sig_cache = (0, None)
+
+    @property
+    def secret(self) -> str:
+        """机器人的secret字段，修改后会重新生成签名"""
+        return self._secret
+
+    @secret.setter
+    def secret(self, secret: str):
+        with self._sig_lock:
+            self._secret = secret
+            self._secret_enc = secret.encode("utf-8")
+            self._secret_suffix = b"\n" + self._secret_enc
+            self._sig_cache = (0, None)
+
+    @classmethod
+    def _get_client(cls):
+        """返回所有实例共享的客户端，首次调用时创建"""
+        with cls._shared_client_lock:
+            if cls._shared_client is None:
+                cls._shared_client = cls._new_client()
+            return cls._shared_client
+
+    @property
+    def client(self):
+        """发送请求使用的http客户端，共享客户端在使用时才获取"""
+        if self._client is not None:
+            return self._client
+        return self._get_client()
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
     @property
     def webhook(self) -> str:
-        """返回完整的webhook地址"""
-        timestamp = str(round(time.time() * 1000))
-        secret_enc = self.secret.encode("utf-8")
-        string_to_sign = "{}\n{}".format(timestamp, self.secret)
-        string_to_sign_enc = string_to_sign.encode("utf-8")
-        hmac_code = hmac.new(
-            secret_enc, string_to_sign_enc, digestmod=hashlib.sha256
-        ).digest()
-        sign = urllib.parse.quote_plus(base64.b64encode(hmac_code))
-        return httpx.URL(
-            "https://oapi.dingtalk.com/robot/send",
-            {
-                "timestamp": timestamp,
-                "sign": sign,
-                "access_token": self.access_token,
-            },
-        )
+        """返回完整的webhook地址，签名在 ``SIGN_CACHE_TTL`` 秒内复用"""
+        now_ms = time.time_ns() // 1_000_000
+        now = now_ms // 1000
+        # 系统时间回拨时差值为负，此时也需要重新签名
+        ts, url = self._sig_cache
+        if 0 <= now - ts < SIGN_CACHE_TTL:
+            return url
+        with self._sig_lock:
+            ts, url = self._sig_cache
+            if 0 <= now - ts < SIGN_CACHE_TTL:
+                return url
+            timestamp = str(now_ms).encode("ascii")
+            hmac_code = hmac.digest(
+                self._secret_enc, timestamp + self._secret_suffix, "sha256"
+            )
+            buf = bytearray(self._url_prefix)
+            buf += b"&timestamp="
+            buf += timestamp
+            buf += b"&sign="
+            buf += _quote_b64(base64.b64encode(hmac_code))
+            url = buf.decode("ascii")
+            self._sig_cache = (now, url)
+            return url
+
+    def _handle_response(self, resp: httpx.Response) -> Union[dict, str]:
+        """解码响应数据并输出日志"""
+        try:
+            res = _json_loads(resp.content)
+        except Exception:
+            self.logger.error("请求返回格式错误")
+            return resp.text
+        code = res.get("errcode")
+        if code == 0:
+            self.logger.info(
+                "请求成功 errcode: %s, errmsg: %s", code, res.get("errmsg")
+            )
+        elif code == 310000:
+            self.logger.error(
+                "校验未通过 errcode: %s, errmsg: %s", code, res.get("errmsg")
+            )
+        else:
+            self.logger.error(
+                "API错误 errcode: %s, errmsg: %s", code, res.get("errmsg")
+            )
+        return res
 
-    def post(self, payload: dict) -> Union[dict, str]:
+
+class DDBot(_BaseDDBot):
+    """钉钉自定义机器人对象(同步)
+    :param access_token: 机器人webhook的access_token字段
+    :param secret: 机器人的secret字段
+    :param logger: 设置为 ``True`` 开启日志或者传入一个 logger 对象用来输出日志,
+                    设置为 `False` 来关闭日志，默认为 `True`
+    :param timeout: 发起http请求时，允许等待响应的时间
+    :param share_client: 是否与其他实例共享同一个http客户端(连接池)，默认为 `True`
+    """
+
+    _shared_client: Optional[httpx.Client] = None
+
+    @staticmethod
+    def _new_client() -> httpx.Client:
+        """创建新的http客户端"""
+        return httpx.Client(http2=HTTP2, limits=CLIENT_LIMITS)
+
+    @classmethod
+    def close_shared_client(cls):
+        """关闭所有实例共享的http客户端，之后再发送请求时会重新创建"""
+        with cls._shared_client_lock:
+            client, cls._shared_client = cls._shared_client, None
+        if client is not None:
+            client.close()
+
+    def post(self, payload: Union[dict, bytes]) -> Union[dict, str]:
         """发送POST请求
-        :param payload: 需要上报的数据(JSON格式)
+        :param payload: 需要上报的数据(JSON格式)，可以是字典或已经序列化的JSON字节串
         :return: 返回响应数据JSON解码后的字典，如果解码失败返回响应的文本内容,
                  如果请求出错，返回None
         """
         try:
-            resp = self.client.post(self.webhook, json=payload)
+            if isinstance(payload, dict):
+                payload = _json_dumps(payload)
+            url = self.webhook
+            resp = self.client.post(
+                url,
+                content=payload,
+                headers=JSON_HEADERS,
+                timeout=self.timeout,
+            )
             resp.raise_for_status()
         except Exception:
-            self.logger.error(traceback.format_exc())
+            self.logger.exception("请求失败")
         else:
-            try:
-                res = resp.json()
-            except Exception:
-                self.logger.error("请求返回格式错误")
-                res = resp.text
-            else:
-                if res["errcode"] == 0:
-                    self.logger.info(
-                        "请求成功 errcode: {errcode}, errmsg: {errmsg}".format(**res)
-                    )
-                elif res["errcode"] == 310000:
-                    self.logger.error(
-                        "校验未通过 errcode: {errcode}, errmsg: {errmsg}".format(**res)
-                    )
-                else:
-                    self.logger.error(
-                        "API错误 errcode: {errcode}, errmsg: {errmsg}".format(**res)
-                    )
-            return res
+            return self._handle_response(resp)
         return None
 
+    def _post(self, build, *args) -> Union[dict, str]:
+        """构建消息体后发送，构建失败时输出日志并返回None"""
+        try:
+            payload = build(*args)
+        except Exception:
+            self.logger.exception("消息构建失败")
+            return None
+        return self.post(payload)
+
     def text(
         self, content: str, atMobiles: Union[int, List[int]] = None, isAtAll=False
     ):
@@ -106,19 +368,7 @@ class DDBot:
         :param atMobiles: 被@人的手机号，可以是单个手机号或手机号列表
         :param isAtAll: 是否@所有人
         """
-        if atMobiles is None:
-            atMobiles = []
-        elif isinstance(atMobiles, Sequence):
-            atMobiles = list(atMobiles)
-        else:
-            atMobiles = [atMobiles]
-        return self.post(
-            {
-                "msgtype": "text",
-                "text": {"content": content},
-                "at": {"atMobiles": [str(i) for i in atMobiles], "isAtAll": isAtAll},
-            }
-        )
+        return self._post(_build_text, content, atMobiles, isAtAll)
 
     def link(self, title: str, text: str, messageURL: str, picURL: str = ""):
         """发送链接(link)类型消息
@@ -127,17 +377,7 @@ class DDBot:
         :param messageURL: 点击消息跳转的URL
         :param picURL: 图片URL
         """
-        return self.post(
-            {
-                "msgtype": "link",
-                "link": {
-                    "text": text,
-                    "title": title,
-                    "picUrl": picURL,
-                    "messageUrl": messageURL,
-                },
-            }
-        )
+        return self._post(_build_link, title, text, messageURL, picURL)
 
     def markdown(
         self,
@@ -152,19 +392,7 @@ class DDBot:
         :param atMobiles: 被@人的手机号，可以是单个手机号或手机号列表
         :param isAtAll: 是否@所有人
         """
-        if atMobiles is None:
-            atMobiles = []
-        elif isinstance(atMobiles, Sequence):
-            atMobiles = list(atMobiles)
-        else:
-            atMobiles = [atMobiles]
-        return self.post(
-            {
-                "msgtype": "markdown",
-                "markdown": {"title": title, "text": text},
-                "at": {"atMobiles": [str(i) for i in atMobiles], "isAtAll": isAtAll},
-            }
-        )
+        return self._post(_build_markdown, title, text, atMobiles, isAtAll)
 
     def wholeActionCard(
         self, title: str, text: str, singleTitle: str, singleURL: str, btnOrientation=0
@@ -176,17 +404,13 @@ class DDBot:
         :param singleURL: 点击singleTitle按钮触发的URL。
         :param btnOrientation: 0：按钮竖直排列 1：按钮横向排列
         """
-        return self.post(
-            {
-                "actionCard": {
-                    "title": title,
-                    "text": text,
-                    "btnOrientation": btnOrientation,
-                    "singleTitle": singleTitle,
-                    "singleURL": singleURL,
-                },
-                "msgtype": "actionCard",
-            }
+        return self._post(
+            _build_whole_action_card,
+            title,
+            text,
+            singleTitle,
+            singleURL,
+            btnOrientation,
         )
 
     def separatedActionCard(
@@ -203,19 +427,8 @@ class DDBot:
                      第1个元素为按钮标题、第2个元素为点击按钮触发的URL。
         :param btnOrientation: 0：按钮竖直排列 1：按钮横向排列
         """
-        if isinstance(btns, tuple):
-            btns = [btns]
-        return self.post(
-            {
-                "msgtype": "actionCard",
-                "actionCard": {
-                    "title": title,
-                    "text": text,
-                    "hideAvatar": "0",
-                    "btnOrientation": btnOrientation,
-                    "btns": [{"title": i[0], "actionURL": i[1]} for i in btns],
-                },
-            }
+        return self._post(
+            _build_separated_action_card, title, text, btns, btnOrientation
         )
 
     def feedCard(self, links: Union[Tuple[str, str, str], List[Tuple[str, str, str]]]):
@@ -224,103 +437,77 @@ class DDBot:
                     第1个元素为单条信息文本、第2个元素为点击单条信息的跳转链接
                     第3个元素为单条信息后面图片的URL。
         """
-        if isinstance(links, tuple):
-            links = [links]
-        return self.post(
-            {
-                "msgtype": "feedCard",
-                "feedCard": {
-                    "links": [
-                        {"title": i[0], "messageURL": i[1], "picURL": i[2]}
-                        for i in links
-                    ]
-                },
-            }
-        )
+        return self._post(_build_feed_card, links)
 
 
-class AsyncDDBot:
+class AsyncDDBot(_BaseDDBot):
     """钉钉自定义机器人对象(异步)
     :param access_token: 机器人webhook的access_token字段
     :param secret: 机器人的secret字段
     :param logger: 设置为 ``True`` 开启日志或者传入一个 logger 对象用来输出日志,
                     设置为 `False` 来关闭日志，默认为 `True`
     :param timeout: 发起http请求时，允许等待响应的时间
+    :param share_client: 是否与同一事件循环中的其他实例共享同一个http客户端(连接池)，
+                         默认为 `True`
     """
 
-    def __init__(self, access_token: str, secret: str, logger=True, timeout=20):
-        self.access_token = access_token
-        self.secret = secret
-        self.client = httpx.AsyncClient(timeout=timeout)
+    # 连接与创建它的事件循环绑定，所以共享的客户端按事件循环区分。
+    # 事件循环结束时不会自动关闭这些客户端，需要调用 ``aclose_shared_client``
+    _shared_clients = weakref.WeakKeyDictionary()
 
-        if not isinstance(logger, bool):
-            self.logger = logger
-        else:
-            self.logger = default_logger
-            if not logging.root.handlers and self.logger.level == logging.NOTSET:
-                if logger:
-                    self.logger.setLevel(logging.INFO)
-                else:
-                    self.logger.setLevel(logging.ERROR)
-                h = logging.StreamHandler()
-                h.setFormatter(
-                    logging.Formatter("%(asctime)s[%(levelname)s] %(message)s")
-                )
-                self.logger.addHandler(h)
+    @staticmethod
+    def _new_client() -> httpx.AsyncClient:
+        """创建新的http客户端"""
+        return httpx.AsyncClient(http2=HTTP2, limits=CLIENT_LIMITS)
 
-    @property
-    def webhook(self) -> str:
-        """返回完整的webhook地址"""
-        timestamp = str(round(time.time() * 1000))
-        secret_enc = self.secret.encode("utf-8")
-        string_to_sign = "{}\n{}".format(timestamp, self.secret)
-        string_to_sign_enc = string_to_sign.encode("utf-8")
-        hmac_code = hmac.new(
-            secret_enc, string_to_sign_enc, digestmod=hashlib.sha256
-        ).digest()
-        sign = urllib.parse.quote_plus(base64.b64encode(hmac_code))
-        return httpx.URL(
-            "https://oapi.dingtalk.com/robot/send",
-            {
-                "timestamp": timestamp,
-                "sign": sign,
-                "access_token": self.access_token,
-            },
-        )
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        """返回当前事件循环中所有实例共享的客户端，首次调用时创建"""
+        loop = asyncio.get_running_loop()
+        client = cls._shared_clients.get(loop)
+        if client is None:
+            client = cls._shared_clients[loop] = cls._new_client()
+        return client
+
+    @classmethod
+    async def aclose_shared_client(cls):
+        """关闭当前事件循环中共享的http客户端，应在事件循环结束前调用"""
+        client = cls._shared_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
 
-    async def post(self, payload: dict) -> Union[dict, str]:
+    async def post(self, payload: Union[dict, bytes]) -> Union[dict, str]:
         """发送POST请求
-        :param payload: 需要上报的数据(JSON格式)
+        :param payload: 需要上报的数据(JSON格式)，可以是字典或已经序列化的JSON字节串
         :return: 返回响应数据JSON解码后的字典，如果解码失败返回响应的文本内容,
                  如果请求出错，返回None
         """
         try:
-            resp = await self.client.post(self.webhook, json=payload)
+            if isinstance(payload, dict):
+                payload = _json_dumps(payload)
+            url = self.webhook
+            resp = await self.client.post(
+                url,
+                content=payload,
+                headers=JSON_HEADERS,
+                timeout=self.timeout,
+            )
             resp.raise_for_status()
         except Exception:
-            self.logger.error(traceback.format_exc())
+            self.logger.exception("请求失败")
         else:
-            try:
-                res = resp.json()
-            except Exception:
-                self.logger.error("请求返回格式错误")
-                res = resp.text
-            else:
-                if res["errcode"] == 0:
-                    self.logger.info(
-                        "请求成功 errcode: {errcode}, errmsg: {errmsg}".format(**res)
-                    )
-                elif res["errcode"] == 310000:
-                    self.logger.error(
-                        "校验未通过 errcode: {errcode}, errmsg: {errmsg}".format(**res)
-                    )
-                else:
-                    self.logger.error(
-                        "API错误 errcode: {errcode}, errmsg: {errmsg}".format(**res)
-                    )
-            return res
+            return self._handle_response(resp)
         return None
 
+    async def _post(self, build, *args) -> Union[dict, str]:
+        """构建消息体后发送，构建失败时输出日志并返回None"""
+        try:
+            payload = build(*args)
+        except Exception:
+            self.logger.exception("消息构建失败")
+            return None
+        return await self.post(payload)
+
     async def text(
         self, content: str, atMobiles: Union[int, List[int]] = None, isAtAll=False
     ):
@@ -329,19 +516,7 @@ class AsyncDDBot:
         :param atMobiles: 被@人的手机号，可以是单个手机号或手机号列表
         :param isAtAll: 是否@所有人
         """
-        if atMobiles is None:
-            atMobiles = []
-        elif isinstance(atMobiles, Sequence):
-            atMobiles = list(atMobiles)
-        else:
-            atMobiles = [atMobiles]
-        return await self.post(
-            {
-                "msgtype": "text",
-                "text": {"content": content},
-                "at": {"atMobiles": [str(i) for i in atMobiles], "isAtAll": isAtAll},
-            }
-        )
+        return await self._post(_build_text, content, atMobiles, isAtAll)
 
     async def link(self, title: str, text: str, messageURL: str, picURL: str = ""):
         """发送链接(link)类型消息
@@ -350,17 +525,7 @@ class AsyncDDBot:
         :param messageURL: 点击消息跳转的URL
         :param picURL: 图片URL
         """
-        return await self.post(
-            {
-                "msgtype": "link",
-                "link": {
-                    "text": text,
-                    "title": title,
-                    "picUrl": picURL,
-                    "messageUrl": messageURL,
-                },
-            }
-        )
+        return await self._post(_build_link, title, text, messageURL, picURL)
 
     async def markdown(
         self,
@@ -375,19 +540,7 @@ class AsyncDDBot:
         :param atMobiles: 被@人的手机号，可以是单个手机号或手机号列表
         :param isAtAll: 是否@所有人
         """
-        if atMobiles is None:
-            atMobiles = []
-        elif isinstance(atMobiles, Sequence):
-            atMobiles = list(atMobiles)
-        else:
-            atMobiles = [atMobiles]
-        return await self.post(
-            {
-                "msgtype": "markdown",
-                "markdown": {"title": title, "text": text},
-                "at": {"atMobiles": [str(i) for i in atMobiles], "isAtAll": isAtAll},
-            }
-        )
+        return await self._post(_build_markdown, title, text, atMobiles, isAtAll)
 
     async def wholeActionCard(
         self, title: str, text: str, singleTitle: str, singleURL: str, btnOrientation=0
@@ -399,17 +552,13 @@ class AsyncDDBot:
         :param singleURL: 点击singleTitle按钮触发的URL。
         :param btnOrientation: 0：按钮竖直排列 1：按钮横向排列
         """
-        return await self.post(
-            {
-                "actionCard": {
-                    "title": title,
-                    "text": text,
-                    "btnOrientation": btnOrientation,
-                    "singleTitle": singleTitle,
-                    "singleURL": singleURL,
-                },
-                "msgtype": "actionCard",
-            }
+        return await self._post(
+            _build_whole_action_card,
+            title,
+            text,
+            singleTitle,
+            singleURL,
+            btnOrientation,
         )
 
     async def separatedActionCard(
@@ -426,19 +575,8 @@ class AsyncDDBot:
                      第1个元素为按钮标题、第2个元素为点击按钮触发的URL。
         :param btnOrientation: 0：按钮竖直排列 1：按钮横向排列
         """
-        if isinstance(btns, tuple):
-            btns = [btns]
-        return await self.post(
-            {
-                "msgtype": "actionCard",
-                "actionCard": {
-                    "title": title,
-                    "text": text,
-                    "hideAvatar": "0",
-                    "btnOrientation": btnOrientation,
-                    "btns": [{"title": i[0], "actionURL": i[1]} for i in btns],
-                },
-            }
+        return await self._post(
+            _build_separated_action_card, title, text, btns, btnOrientation
         )
 
     async def feedCard(
@@ -449,16 +587,19 @@ class AsyncDDBot:
                     第1个元素为单条信息文本、第2个元素为点击单条信息的跳转链接
                     第3个元素为单条信息后面图片的URL。
         """
-        if isinstance(links, tuple):
-            links = [links]
-        return await self.post(
-            {
-                "msgtype": "feedCard",
-                "feedCard": {
-                    "links": [
-                        {"title": i[0], "messageURL": i[1], "picURL": i[2]}
-                        for i in links
-                    ]
-                },
-            }
-        )
+        return await self._post(_build_feed_card, links)
+
+
+def _reset_shared_clients():
+    """fork之后子进程不能复用父进程的连接，丢弃共享的客户端。
+    fork时其他线程可能正持有锁，所以同时重建所有锁
+    """
+    _BaseDDBot._shared_client_lock = threading.Lock()
+    for bot in list(_BaseDDBot._instances):
+        bot._sig_lock = threading.Lock()
+    DDBot._shared_client = None
+    AsyncDDBot._shared_clients = weakref.WeakKeyDictionary()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_shared_clients)